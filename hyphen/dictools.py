@@ -3,20 +3,37 @@
 '''
 This module contains convenience functions to manage hyphenation dictionaries.
 '''
-from __future__ import unicode_literals
-
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import hashlib
+import io
 import json
 import os
+import secrets
+import shutil
+import tempfile
+import threading
+import urllib.error
+import urllib.request
+from xml.etree.ElementTree import iterparse
 
 import appdirs
-from six.moves import urllib
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
-__all__ = ['install', 'is_installed', 'uninstall', 'list_installed']
+__all__ = ['install', 'install_many', 'is_installed', 'uninstall', 'list_installed',
+           'clear_repository_cache']
 
 
 DEFAULT_DICT_PATH = appdirs.user_data_dir("pyhyphen", appauthor=False)
+DEFAULT_CACHE_PATH = appdirs.user_cache_dir("pyhyphen", appauthor=False)
 DEFAULT_REPOSITORY = 'http://cgit.freedesktop.org/libreoffice/dictionaries/plain/'
+# Set to True to write dictionaries.json with sorted keys, for debugging
+SORT_CONFIG_KEYS = False
 # This is a list of languages supported by PyHyphen. In the following, language
 # codes are assumed to be in this list.
 LANGUAGES = ['af_ZA', 'an_ES', 'ar', 'be_BY', 'bg_BG', 'bn_BD', 'br_FR', 'ca',
@@ -27,29 +44,45 @@ LANGUAGES = ['af_ZA', 'an_ES', 'ar', 'be_BY', 'bg_BG', 'bn_BD', 'br_FR', 'ca',
              'sk_SK', 'sl_SI', 'sr', 'sv_SE', 'sw_TZ', 'te_IN', 'th_TH',
              'uk_UA', 'zu_ZA']
 
+# Namespaces and paths used to extract dictionary properties from xcu files
+_XCU_NAMESPACES = {'oor': 'http://openoffice.org/2001/registry'}
+_XCU_NAME_ATTRIBUTE = '{http://openoffice.org/2001/registry}name'
+_XCU_LOCATIONS_PATH = "prop[@oor:name='Locations']/value"
+_XCU_LOCALES_PATH = "prop[@oor:name='Locales']/value"
+
+# Convert xcu locales, such as 'en-US', to 'en_US'
+_LOCALE_TRANS = str.maketrans('-', '_')
+
+# Serialize changes to the dictionaries configurations
+_CONFIG_LOCK = threading.RLock()
+# Shared Dictionaries instances, by directory
+_DICTIONARIES = {}
+# Serialize writes to the cache of downloaded xcu files
+_XCU_CACHE_LOCK = threading.Lock()
+
 
 class Dictionaries(object):
 
     def __init__(self, directory=None):
         self.directory = directory or DEFAULT_DICT_PATH
-        self._data = None
+        self.path = os.path.join(self.directory, 'dictionaries.json')
 
-        if not os.path.exists(self.directory):
-            os.makedirs(self.directory)
+        os.makedirs(self.directory, exist_ok=True)
 
-    @property
-    def path(self):
-        return os.path.join(self.directory, 'dictionaries.json')
+        self._load()
 
-    @property
-    def data(self):
-        if self._data is None:
-            if os.path.exists(self.path):
-                with open(self.path) as f:
-                    self._data = json.load(f)
-            else:
-                self._data = {}
-        return self._data
+    def _load(self):
+        if os.path.exists(self.path):
+            with open(self.path, "rb") as f:
+                self.data = _loads(f.read())
+        else:
+            self.data = {}
+        # Reverse index: filename -> set of locales that use this file
+        self._by_file = {}
+        for locale, props in self.data.items():
+            self._by_file.setdefault(props["file"], set()).add(locale)
+        # Resolved dictionary paths: locale -> absolute file path
+        self._filepath_cache = {}
 
     def installed_languages(self):
         return sorted(self.data.keys())
@@ -58,63 +91,175 @@ class Dictionaries(object):
         return language in self.data
 
     def filepath(self, language):
-        return os.path.join(self.directory, self.data[language]["file"])
+        filepath = self._filepath_cache.get(language)
+        if filepath is None:
+            filepath = os.path.join(self.directory, self.data[language]["file"])
+            self._filepath_cache[language] = filepath
+        return filepath
 
     def add(self, language, content, locales, url):
         """
+        Save the dictionary content and add its locales to the configuration.
+
+        content (bytes or file object): dictionary content. File objects, such
+            as http responses, are streamed to disk by chunks.
+
         Return the path to which the file was saved.
         """
-        # Save to file
-        filename = 'hyph_' + language + ".dic"
-        filepath = os.path.join(self.directory, filename)
-        with open(filepath, 'wb') as f:
-            f.write(content)
+        return self.add_many([(language, content, locales, url)])[0]
 
-        # Add file to configuration
-        for locale in locales:
-            self.data[locale] = {
-                "file": filename,
-                "url": url
-            }
-        self.save()
+    def add_many(self, entries):
+        """
+        Add multiple dictionaries and save the configuration only once.
+
+        entries: list of (language, content, locales, url) tuples, with the
+            same meaning as the arguments of `add`.
 
+        Return the list of paths to which the files were saved.
+        """
+        filepaths = [
+            self._write_file(language, content)
+            for language, content, _locales, _url in entries
+        ]
+        with _CONFIG_LOCK:
+            for language, _content, locales, url in entries:
+                self._register(language, locales, url)
+            self.save()
+        return filepaths
+
+    def _write_file(self, language, content):
+        filepath = os.path.join(self.directory, 'hyph_' + language + ".dic")
+        # Streamed content is written to a temporary file first, such that an
+        # interrupted download does not overwrite an existing dictionary
+        _replace_file(filepath, lambda f: _write_content(f, content))
         return filepath
 
+    def _register(self, language, locales, url):
+        # Add file to configuration. All locales share the same record.
+        filename = 'hyph_' + language + ".dic"
+        self._filepath_cache.clear()
+        data = self.data
+        record = {
+            "file": filename,
+            "url": url
+        }
+        file_locales = self._by_file.setdefault(filename, set())
+        for locale in locales:
+            if locale in data:
+                self._by_file[data[locale]["file"]].discard(locale)
+            data[locale] = record
+            file_locales.add(locale)
+
     def remove(self, language):
         """
         Remove language and all languages that share the same file.
         """
-        if language not in self.data:
-            return
-
-        # Remove languages from file
-        filename = self.data[language]["file"]
-        languages = [language for language,
-                     props in self.data.items() if props["file"] == filename]
-        for locale in languages:
-            self.data.pop(locale)
-        self.save()
-
-        # Remove file
-        filepath = os.path.join(self.directory, filename)
-        if os.path.exists(filepath):
-            os.remove(filepath)
+        with _CONFIG_LOCK:
+            if language not in self.data:
+                return
+
+            # Remove languages from file
+            filename = self.data[language]["file"]
+            for locale in self._by_file.pop(filename, ()):
+                self.data.pop(locale, None)
+            self._filepath_cache.clear()
+            self.save()
+
+            # Remove file
+            filepath = os.path.join(self.directory, filename)
+            if os.path.exists(filepath):
+                os.remove(filepath)
 
     def save(self):
-        # Access data to make sure it's properly loaded
-        data = self.data
-        with open(self.path, "w") as f:
-            json.dump(data, f, indent=2, sort_keys=True)
+        with _CONFIG_LOCK:
+            # Write to a temporary file first, such that an interrupted save
+            # does not leave a corrupted configuration file behind
+            _replace_file(self.path, lambda f: f.write(_dumps(self.data)))
+            self._discard_shared_instance()
 
     def reload(self):
-        self._data = None
+        with _CONFIG_LOCK:
+            self._load()
+            self._discard_shared_instance()
+
+    def _discard_shared_instance(self):
+        # The shared instance for this directory might now be out of date,
+        # unless it is this one
+        if _DICTIONARIES.get(self.directory) is not self:
+            _DICTIONARIES.pop(self.directory, None)
+
+
+def _write_content(f, content):
+    if isinstance(content, (bytes, bytearray)):
+        f.write(content)
+    else:
+        shutil.copyfileobj(content, f, 64 * 1024)
+
+
+def _replace_file(path, write):
+    '''
+    Call write(f) with a temporary file from the same directory, then move it
+    to 'path'. The temporary file is removed if writing fails, in which case
+    'path' is left untouched.
+
+    The file keeps the permissions of the file it replaces. New files get the
+    default permissions, as set by the umask.
+    '''
+    temp_path = path + '.' + secrets.token_hex(8) + '.tmp'
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        try:
+            os.chmod(temp_path, os.stat(path).st_mode & 0o777)
+        except FileNotFoundError:
+            pass
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def _loads(content):
+    '''
+    Parse utf-8 encoded JSON content, with orjson if it is available.
+    '''
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content.decode("utf-8"))
+
+
+def _dumps(data):
+    '''
+    Serialize data to compact utf-8 encoded JSON, with orjson if it is
+    available. The dictionaries.json file is machine-managed, so it is not
+    indented, and keys are only sorted if SORT_CONFIG_KEYS is True.
+    '''
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_SORT_KEYS if SORT_CONFIG_KEYS else None)
+    return json.dumps(
+        data, separators=(',', ':'), ensure_ascii=False, sort_keys=SORT_CONFIG_KEYS
+    ).encode("utf-8")
+
+
+def _get_dictionaries(directory=None):
+    '''
+    Return a shared Dictionaries instance for the directory, such that the
+    configuration file is parsed only once.
+    '''
+    directory = directory or DEFAULT_DICT_PATH
+    with _CONFIG_LOCK:
+        dictionaries = _DICTIONARIES.get(directory)
+        if dictionaries is None:
+            dictionaries = _DICTIONARIES[directory] = Dictionaries(directory)
+        return dictionaries
 
 
 def list_installed(directory=None):
     '''
     Return a list of locales for which dictionaries are installed.
     '''
-    return Dictionaries(directory).installed_languages()
+    return _get_dictionaries(directory).installed_languages()
 
 
 def is_installed(language, directory=None):
@@ -124,7 +269,7 @@ def is_installed(language, directory=None):
     By convention, 'language' should have the form 'll_CC'.
     Example: 'en_US' for US English.
     '''
-    return Dictionaries(directory).is_installed(language)
+    return _get_dictionaries(directory).is_installed(language)
 
 
 def uninstall(language, directory=None):
@@ -134,7 +279,7 @@ def uninstall(language, directory=None):
     'language': is by convention a string of the form 'll_CC' whereby ll is the
         language code and CC the country code.
     '''
-    Dictionaries(directory).remove(language)
+    _get_dictionaries(directory).remove(language)
 
 
 def install(language, directory=None, repos=None, use_description=True, overwrite=False):
@@ -152,10 +297,80 @@ def install(language, directory=None, repos=None, use_description=True, overwrit
     Return the path to the file that was downloaded or is already installed.
     '''
     if not overwrite:
-        dictionaries = Dictionaries(directory)
+        dictionaries = _get_dictionaries(directory)
         if dictionaries.is_installed(language):
             return dictionaries.filepath(language)
 
+    dict_url, locales = _find_dictionary_url(language, repos, use_description)
+
+    # Install the dictionary file
+    with urllib.request.urlopen(dict_url) as response:
+        return _get_dictionaries(directory).add(language, response, locales, dict_url)
+
+
+def install_many(languages, directory=None, repos=None, use_description=True,
+                 overwrite=False, max_workers=8):
+    '''
+    Download and install multiple dictionary files. Downloads are performed
+    concurrently and the dictionary configuration is saved only once.
+    Languages that are supported by the dictionary of a previous language are
+    not downloaded again.
+
+    languages (str list): codes of the form 'll_CC'.
+    max_workers (int): maximum number of concurrent downloads. Default: 8
+    Other arguments are the same as for `install`.
+
+    Return the list of paths to the files that were downloaded or are already
+    installed, in the same order as 'languages'.
+    '''
+    dictionaries = _get_dictionaries(directory)
+    filepaths = {}
+    to_download = []
+    for language in languages:
+        if not overwrite and dictionaries.is_installed(language):
+            filepaths[language] = dictionaries.filepath(language)
+        elif language not in to_download:
+            to_download.append(language)
+
+    if to_download:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            locations = list(executor.map(
+                lambda language: _find_dictionary_url(language, repos, use_description),
+                to_download))
+
+            # Languages that are covered by the locales of a previous
+            # dictionary share its file: download each dictionary only once.
+            downloads = []
+            owners = {}
+            for language, (dict_url, locales) in zip(to_download, locations):
+                if language in owners:
+                    continue
+                for locale in [language] + list(locales):
+                    owners.setdefault(locale, len(downloads))
+                downloads.append((language, dict_url, locales))
+
+            futures = [
+                executor.submit(_download_dictionary, dictionaries.directory, *download)
+                for download in downloads
+            ]
+        try:
+            entries = [future.result() for future in futures]
+            saved_filepaths = dictionaries.add_many(entries)
+        finally:
+            # Remove the temporary files
+            for future in futures:
+                if future.exception() is None:
+                    future.result()[1].close()
+        for language in to_download:
+            filepaths[language] = saved_filepaths[owners[language]]
+
+    return [filepaths[language] for language in languages]
+
+
+def _find_dictionary_url(language, repos, use_description):
+    '''
+    Return the url of the dictionary file and the list of locales it supports.
+    '''
     if not repos:
         repos = DEFAULT_REPOSITORY
 
@@ -167,33 +382,51 @@ def install(language, directory=None, repos=None, use_description=True, overwrit
         # handle the case that there is no xml metadata: we just guess its url
         dict_url = repos + 'hyph_dict_' + language + '.dic'
         locales = [language]
+    return dict_url, locales
 
-    # Install the dictionary file
-    dict_content = urllib.request.urlopen(dict_url).read()
-    return Dictionaries(directory).add(language, dict_content, locales, dict_url)
+
+def _download_dictionary(directory, language, dict_url, locales):
+    '''
+    Download the dictionary to a temporary file in 'directory', such that the
+    content does not need to fit in memory. Return a (language, file, locales,
+    url) tuple that can be passed to `Dictionaries.add_many`. The file is
+    deleted when it is closed.
+    '''
+    f = tempfile.TemporaryFile(dir=directory)
+    try:
+        with urllib.request.urlopen(dict_url) as response:
+            shutil.copyfileobj(response, f, 64 * 1024)
+        f.seek(0)
+    except BaseException:
+        f.close()
+        raise
+    return language, f, locales, dict_url
 
 
 def find_dictionary_location(repos, language):
     '''
     Find the location of a language dictionary from an xcu file from the LibreOffice repo.
     Raise an IOError if the dictionary location could not be found in the xcu file.
+
+    Parsed xcu files are cached, such that locales which share the same xcu
+    file do not download it again. Call `clear_repository_cache` to discard
+    them. Downloaded xcu files are also stored in the user cache directory to
+    avoid downloading unmodified files again.
     '''
     # Download the dictionaries.xcu file from the LibreOffice repository if needed
     # This is an XML file that lists all the available dictionaries for that language.
-    # First, try full language name; it won't work in all cases...
-    origin_url = repos + language
-    descr_file = _download_dictionaries_xcu(origin_url)
-    if descr_file is None and len(language) > 2:
-        # OK. So try with the country code.
-        origin_url = repos + language[:2]
-        descr_file = _download_dictionaries_xcu(origin_url)
-
-    if not descr_file:
+    # First, try full language name; it won't work in all cases... So also try
+    # with the country code.
+    origin_urls = [repos + language]
+    if len(language) > 2:
+        origin_urls.append(repos + language[:2])
+    origin_url, records = _fetch_first_xcu(origin_urls)
+
+    if records is None:
         return None, []
 
-    # Parse the xml file if it is present, and extract the data.
-    dict_url, locales = parse_dictionary_location(
-        descr_file, origin_url, language)
+    # Extract the data from the parsed xml file.
+    dict_url, locales = _match_dictionary_location(records, origin_url, language)
 
     if not dict_url:
         # Catch the case that there is no hyphenation dict
@@ -204,6 +437,14 @@ def find_dictionary_location(repos, language):
     return dict_url, locales
 
 
+def clear_repository_cache():
+    '''
+    Discard the cached dictionaries.xcu files that were parsed by
+    `find_dictionary_location`.
+    '''
+    _fetch_xcu.cache_clear()
+
+
 def parse_dictionary_location(descr_file, origin_url, language):
     '''
     Parse the dictionaries.xcu file to find the url of the most appropriate
@@ -217,55 +458,216 @@ def parse_dictionary_location(descr_file, origin_url, language):
         url (unicode)
         locales (unicode list)
     '''
-    try:
-        from xml.etree.cElementTree import ElementTree
-    except ImportError:
-        from xml.etree.ElementTree import ElementTree
+    return _match_dictionary_location(
+        _iter_dictionary_records(descr_file), origin_url, language)
+
+
+def _match_dictionary_location(records, origin_url, language):
+    '''
+    Return the url and locales of the first hyphenation dictionary record that
+    supports the language, or (None, []).
+    '''
+    for dict_location, locales in records:
+        if language in locales:
+            # strip the prefix '%origin%'
+            dict_url = origin_url + '/' + dict_location[9:]
+            return dict_url, list(locales)
+    return None, []
 
-    descr_tree = ElementTree(file=descr_file)
 
+def _iter_dictionary_records(descr_file):
+    '''
+    Iterate over the hyphenation dictionaries of the xcu file and yield
+    (dict_location, locales) tuples.
+    '''
     # Find the nodes containing meta data of hyphenation dictionaries
-    # Iterate over all nodes
-    for node in descr_tree.iter('node'):
+    # Nodes are streamed as they are parsed, so that parse_dictionary_location
+    # can stop reading the file as soon as a matching dictionary is found.
+    # Processed nodes are removed from the tree, so that memory usage does not
+    # grow with the size of the file. The stack of open elements keeps track
+    # of their parents.
+    parents = []
+    for event, node in iterparse(descr_file, events=("start", "end")):
+        if event == "start":
+            parents.append(node)
+            continue
+        parents.pop()
+        if node.tag != 'node':
+            continue
+
         # Check if node relates to a hyphenation dict.
-        # We assume this is the case if an attribute value
-        # contains the substring 'hyphdic'
-        node_is_hyphen = any(
-            [name for name, value in node.items() if 'hyphdic' in value.lower()])
+        # We assume this is the case if the node name
+        # contains the substring 'HyphDic' (or 'hyphdic')
+        node_name = node.get(_XCU_NAME_ATTRIBUTE, '')
+        node_is_hyphen = 'HyphDic' in node_name or 'hyphdic' in node_name
+
+        if node_is_hyphen:
+            # Found a hyphenation dict! So extract the data and construct the
+            # local record
+            locations_value = node.find(_XCU_LOCATIONS_PATH, _XCU_NAMESPACES)
+            locales_value = node.find(_XCU_LOCALES_PATH, _XCU_NAMESPACES)
+            if locations_value is not None and locales_value is not None:
+                # The text is a list of strings of the form %origin%<filename>
+                # For simplicity, we only use the first filename in the list.
+                dict_location = locations_value.text.split()[0]
+                # The text is a list of locales.
+                locales = locales_value.text.translate(_LOCALE_TRANS).split()
+                yield dict_location, locales
+
+        if parents:
+            parents[-1].remove(node)
+
+
+class _UnavailableXcuError(Exception):
+    '''
+    Raised when a dictionaries.xcu file could not be downloaded because of a
+    possibly transient error, such as a network error.
+    '''
 
-        if not node_is_hyphen:
-            continue
 
-        # Found a hyphenation dict! So extract the data and construct the local
-        # record
-        locales = []
-        dict_location = None
-        for prop in node.getchildren():
-            for _pk, pv in prop.items():
-                if pv.lower() == 'locations':
-                    # Its only child's text is a list of strings of the form %origin%<filename>
-                    # For simplicity, we only use the first filename in the
-                    # list.
-                    dict_location = prop.getchildren()[0].text.split()[0]
-                elif pv.lower() == 'locales':
-                    # Its only child's text is a list of locales.
-                    locales = prop.getchildren()[0].text.replace(
-                        '-', '_').split()
-                    # break # skip any other values of this property
-        if language in locales and dict_location:
-            # strip the prefix '%origin%'
-            dict_url = origin_url + '/' + dict_location[9:]
-            return dict_url, locales
+@functools.lru_cache(maxsize=64)
+def _fetch_xcu(origin_url):
+    '''
+    Download and parse the dictionaries.xcu file from the url. Return a tuple
+    of (dict_location, locales) records, or None if there is no such file on
+    the server. Raise _UnavailableXcuError if the file could not be
+    downloaded; such failures are thus not cached.
+    '''
+    descr_file = _download_dictionaries_xcu(origin_url)
+    if descr_file is None:
+        return None
+    with descr_file:
+        return tuple(
+            (dict_location, tuple(locales))
+            for dict_location, locales in _iter_dictionary_records(descr_file)
+        )
 
-    return None, []
+
+def _fetch_first_xcu(origin_urls):
+    '''
+    Fetch the dictionaries.xcu files from all urls concurrently. Return the
+    first url, in order of preference, for which the download succeeded, and
+    the corresponding records. Return (None, None) if all downloads failed.
+    Note that all urls are requested, even if the preferred one exists.
+
+    Only urls that are missing or could not be downloaded are skipped: other
+    errors, such as a connection reset while reading the preferred file, are
+    raised.
+    '''
+    if len(origin_urls) == 1:
+        try:
+            records = _fetch_xcu(origin_urls[0])
+        except _UnavailableXcuError:
+            return None, None
+        if records is None:
+            return None, None
+        return origin_urls[0], records
+
+    # All downloads are completed before returning, such that none of them
+    # keeps running in the background. Their results are memoized by
+    # _fetch_xcu, so later lookups don't send these requests again.
+    with ThreadPoolExecutor(max_workers=len(origin_urls)) as executor:
+        futures = [executor.submit(_fetch_xcu, origin_url)
+                   for origin_url in origin_urls]
+
+    for origin_url, future in zip(origin_urls, futures):
+        try:
+            records = future.result()
+        except _UnavailableXcuError:
+            continue
+        if records is not None:
+            return origin_url, records
+    return None, None
 
 
-def _download_dictionaries_xcu(origin_url):
+def _download_dictionaries_xcu(origin_url, use_cache=True):
     '''
-    Try to download dictionaries.xcu from the url. In case of error, return None.
+    Try to download dictionaries.xcu from the url. Return None if the file does
+    not exist on the server. Raise _UnavailableXcuError in case of other
+    errors.
+
+    Downloaded files are cached in the user cache directory along with their
+    ETag and Last-Modified headers, such that the file is not downloaded again if it
+    did not change on the server. If 'use_cache' is False, the file is
+    downloaded unconditionally.
     '''
     url = origin_url + '/dictionaries.xcu'
+    cache_path = _xcu_cache_path(url)
+
+    headers = {}
+    if use_cache and os.path.exists(cache_path):
+        validators = _load_xcu_validators().get(url, {})
+        if validators.get("etag"):
+            headers['If-None-Match'] = validators["etag"]
+        if validators.get("last_modified"):
+            headers['If-Modified-Since'] = validators["last_modified"]
+
     try:
-        return urllib.request.urlopen(url)
+        response = urllib.request.urlopen(urllib.request.Request(url, headers=headers))
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            # Not modified: use the cached file
+            try:
+                return open(cache_path, 'rb')
+            except FileNotFoundError:
+                # The cached file was removed in the meantime
+                return _download_dictionaries_xcu(origin_url, use_cache=False)
+        if e.code in (404, 410):
+            return None
+        raise _UnavailableXcuError(url)
     except urllib.error.URLError:
-        return None
+        raise _UnavailableXcuError(url)
+
+    validators = {
+        "etag": response.headers.get('ETag'),
+        "last_modified": response.headers.get('Last-Modified'),
+    }
+    if not any(validators.values()):
+        # There is no way to check whether the file changed: don't cache it
+        return response
+
+    with response:
+        content = response.read()
+    try:
+        with _XCU_CACHE_LOCK:
+            _save_xcu_cache(url, content, validators)
+    except OSError:
+        # The cache is only an optimization: don't fail if it is not writable
+        pass
+    return io.BytesIO(content)
+
+
+def _xcu_cache_path(url):
+    filename = hashlib.sha1(url.encode('utf-8')).hexdigest() + '.xcu'
+    return os.path.join(DEFAULT_CACHE_PATH, 'xcu', filename)
+
+
+def _xcu_validators_path():
+    return os.path.join(DEFAULT_CACHE_PATH, 'xcu_etags.json')
+
+
+def _load_xcu_validators():
+    '''
+    Return the cached {url: {"etag": ..., "last_modified": ...}} headers.
+    '''
+    try:
+        with open(_xcu_validators_path(), encoding="utf-8") as f:
+            return json.load(f)
+    except (IOError, ValueError):
+        return {}
+
+
+def _save_xcu_cache(url, content, validators):
+    '''
+    Store the content of the xcu file and the headers that will be used to
+    check whether it was modified.
+    '''
+    cache_path = _xcu_cache_path(url)
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    _replace_file(cache_path, lambda f: _write_content(f, content))
+
+    all_validators = _load_xcu_validators()
+    all_validators[url] = validators
+    _replace_file(
+        _xcu_validators_path(),
+        lambda f: f.write(json.dumps(all_validators, separators=(',', ':')).encode("utf-8")))
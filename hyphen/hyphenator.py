@@ -24,8 +24,6 @@
 # the GNU Lesser General Public License Version 2.1 or later (the "LGPL",
 
 
-import six
-
 from . import dictools
 from . import hnj
 
@@ -68,7 +66,7 @@ class Hyphenator:
         * it is not encodable to the dictionary's encoding, or
         * the hyphenator could not find any hyphenation point
         '''
-        if not isinstance(word, six.text_type):
+        if not isinstance(word, str):
             raise TypeError('Unicode object expected.')
 
         # Discard very short words
@@ -95,7 +93,7 @@ class Hyphenator:
         Results are not consistent in case of non-standard hyphenation as a join of the syllables
         would not yield the original word.
         '''
-        if not isinstance(word, six.text_type):
+        if not isinstance(word, str):
             raise TypeError('Unicode object expected.')
         # discard very short words
         if (len(word) < 4) or ('=' in word):
@@ -18,7 +18,6 @@ arg_dict = dict(
         'Development Status :: 5 - Production/Stable',
         'Operating System :: OS Independent',
         'Programming Language :: Python',
-        'Programming Language :: Python :: 2.7',
         'Programming Language :: Python :: 3',
         'Programming Language :: Python :: 3.4',
         'Programming Language :: Python :: 3.5',
@@ -36,7 +35,9 @@ arg_dict = dict(
                                  'src/hyphen.c',
                                  'src/hnjalloc.c'],
                   include_dirs=['include'])],
-    install_requires=['appdirs', 'six'],
+    install_requires=['appdirs'],
+    extras_require={'orjson': ['orjson']},
+    python_requires='>=3.4',
 )
 
 
@@ -1,15 +1,106 @@
-from __future__ import unicode_literals
+from concurrent.futures import ThreadPoolExecutor
+import io
+import json
 import os
 import shutil
 import tempfile
 import unittest
+import urllib.error
+from unittest import mock
 
 import hyphen.dictools
 
+class FailingReader(object):
+    """
+    File object that returns some content, then fails like a dropped
+    connection.
+    """
+
+    def __init__(self, content):
+        self.content = content
+
+    def read(self, size=-1):
+        if self.content is None:
+            raise ConnectionResetError()
+        content, self.content = self.content, None
+        return content
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+class FakeResponse(io.BytesIO):
+    """
+    Http response with the given content and headers.
+    """
+
+    def __init__(self, content, headers=None):
+        super(FakeResponse, self).__init__(content)
+        self.headers = headers or {}
+
+
+class FakeServer(object):
+    """
+    Mock of urlopen that returns the next response and records requests.
+    Responses that are exceptions, or functions that return exceptions, are
+    raised.
+    """
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def __call__(self, request):
+        self.requests.append(request)
+        response = self.responses.pop(0)
+        if callable(response):
+            response = response()
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+class FakeRepository(object):
+    """
+    Mock of urlopen that serves the xcu fixtures at the given urls, and
+    records the requested urls. Other urls are not found. Responses that are
+    exceptions are raised.
+    """
+
+    def __init__(self, files):
+        self.files = files
+        self.requested = []
+
+    def __call__(self, request):
+        url = request.full_url
+        self.requested.append(url)
+        response = self.files.get(url)
+        if response is None:
+            raise urllib.error.HTTPError(url, 404, "Not Found", {}, None)
+        if isinstance(response, Exception):
+            raise response
+        with open(os.path.join(os.path.dirname(__file__), "fixtures", response, "dictionaries.xcu"), "rb") as f:
+            return FakeResponse(f.read())
+
+
+def not_modified():
+    return urllib.error.HTTPError("http://pouac.com/en/dictionaries.xcu", 304, "Not Modified", {}, None)
+
+
 class TestDictools(unittest.TestCase):
 
     def setUp(self):
         self.directory = tempfile.mkdtemp(prefix='pyhyphen')
+        hyphen.dictools.clear_repository_cache()
+        # Don't write to the user cache directory
+        self.cache_directory = tempfile.mkdtemp(prefix='pyhyphen-cache')
+        self.addCleanup(shutil.rmtree, self.cache_directory)
+        patcher = mock.patch.object(hyphen.dictools, "DEFAULT_CACHE_PATH", self.cache_directory)
+        patcher.start()
+        self.addCleanup(patcher.stop)
 
     def tearDown(self):
         if os.path.exists(self.directory):
@@ -24,6 +115,31 @@ class TestDictools(unittest.TestCase):
         self.assertTrue(os.path.exists(directory))
         self.assertTrue(os.path.exists(dictionaries.path))
 
+    def test_save_default_permissions(self):
+        dictionaries = hyphen.dictools.Dictionaries(self.directory)
+        filepath = dictionaries.add("fr_FR", b"content", ['fr_FR'], "http://pouac.com")
+
+        umask = os.umask(0)
+        os.umask(umask)
+        self.assertEqual(0o666 & ~umask, os.stat(dictionaries.path).st_mode & 0o777)
+        self.assertEqual(0o666 & ~umask, os.stat(filepath).st_mode & 0o777)
+
+    def test_save_keeps_permissions(self):
+        dictionaries = hyphen.dictools.Dictionaries(self.directory)
+        dictionaries.save()
+        os.chmod(dictionaries.path, 0o640)
+        dictionaries.save()
+
+        self.assertEqual(0o640, os.stat(dictionaries.path).st_mode & 0o777)
+
+    def test_failed_save_removes_temporary_file(self):
+        dictionaries = hyphen.dictools.Dictionaries(self.directory)
+        with mock.patch.object(hyphen.dictools, '_dumps', side_effect=ValueError):
+            with self.assertRaises(ValueError):
+                dictionaries.save()
+
+        self.assertEqual([], os.listdir(self.directory))
+
     def test_dict_directory_is_created_on_add(self):
         directory = os.path.join(self.directory, "mydir")
         self.assertFalse(os.path.exists(directory))
@@ -59,3 +175,392 @@ class TestDictools(unittest.TestCase):
             url, locales = hyphen.dictools.parse_dictionary_location(xcu, origin_url, "fr_FR")
             self.assertEqual("http://pouac.com/hyph_fr.dic", url)
             self.assertEqual(["fr_FR", "fr_BE", "fr_CA", "fr_CH", "fr_MC", "fr_LU"], locales)
+
+    def test_is_installed_after_add(self):
+        self.assertFalse(hyphen.dictools.is_installed('fr_FR', directory=self.directory))
+        dictionaries = hyphen.dictools.Dictionaries(self.directory)
+        dictionaries.add("fr_FR", b"content", ['fr_BE', 'fr_FR'], "http://pouac.com")
+
+        self.assertTrue(hyphen.dictools.is_installed('fr_FR', directory=self.directory))
+
+    def test_add_file_object(self):
+        dictionaries = hyphen.dictools.Dictionaries(self.directory)
+        filepath = dictionaries.add("fr_FR", io.BytesIO(b"content"), ['fr_FR'], "http://pouac.com")
+
+        with open(filepath, 'rb') as f:
+            self.assertEqual(b"content", f.read())
+
+    def test_add_interrupted_download(self):
+        dictionaries = hyphen.dictools.Dictionaries(self.directory)
+        filepath = dictionaries.add("fr_FR", b"content", ['fr_BE', 'fr_FR'], "http://pouac.com")
+
+        with self.assertRaises(ConnectionResetError):
+            dictionaries.add("fr_FR", FailingReader(b"xyz"), ['fr_BE', 'fr_FR'], "http://pouac.com")
+
+        with open(filepath, 'rb') as f:
+            self.assertEqual(b"content", f.read())
+        self.assertEqual(['dictionaries.json', 'hyph_fr_FR.dic'], sorted(os.listdir(self.directory)))
+
+    def test_uninstall_removes_locales_sharing_file(self):
+        dictionaries = hyphen.dictools.Dictionaries(self.directory)
+        dictionaries.add("fr_FR", b"content", ['fr_BE', 'fr_FR'], "http://pouac.com")
+        dictionaries.add("en_US", b"content", ['en_US'], "http://pouac.com")
+
+        dictionaries = hyphen.dictools.Dictionaries(self.directory)
+        dictionaries.remove('fr_BE')
+        self.assertEqual(['en_US'], dictionaries.installed_languages())
+
+    def test_add_many(self):
+        dictionaries = hyphen.dictools.Dictionaries(self.directory)
+        filepaths = dictionaries.add_many([
+            ("fr_FR", b"content", ['fr_BE', 'fr_FR'], "http://pouac.com"),
+            ("en_US", b"content", ['en_US'], "http://pouac.com"),
+        ])
+
+        self.assertEqual(2, len(filepaths))
+        self.assertTrue(all(os.path.exists(filepath) for filepath in filepaths))
+        self.assertEqual(['en_US', 'fr_BE', 'fr_FR'], hyphen.dictools.list_installed(self.directory))
+
+    def install_many(self, languages, **kwargs):
+        """
+        Call install_many with mocked dictionary locations and downloads.
+        Dictionaries of 'fr_*' locales support all french locales.
+        """
+        def find_dictionary_url(language, repos, use_description):
+            if language.startswith("fr_"):
+                return "http://pouac.com/hyph_fr.dic", ["fr_FR", "fr_BE", "fr_CA"]
+            return "http://pouac.com/hyph_" + language + ".dic", [language]
+
+        urls = []
+
+        def urlopen(url):
+            urls.append(url)
+            return io.BytesIO(url.encode())
+
+        with mock.patch.object(hyphen.dictools, "_find_dictionary_url", find_dictionary_url):
+            with mock.patch.object(hyphen.dictools.urllib.request, "urlopen", urlopen):
+                filepaths = hyphen.dictools.install_many(
+                    languages, directory=self.directory, **kwargs)
+        return filepaths, urls
+
+    def test_install_many(self):
+        filepaths, urls = self.install_many(["en_US", "de"])
+
+        self.assertEqual([
+            os.path.join(self.directory, "hyph_en_US.dic"),
+            os.path.join(self.directory, "hyph_de.dic"),
+        ], filepaths)
+        self.assertEqual(
+            ["http://pouac.com/hyph_en_US.dic", "http://pouac.com/hyph_de.dic"], urls)
+        self.assertEqual(["de", "en_US"], hyphen.dictools.list_installed(self.directory))
+
+    def test_install_many_duplicates(self):
+        filepaths, urls = self.install_many(["en_US", "en_US"])
+
+        self.assertEqual([os.path.join(self.directory, "hyph_en_US.dic")] * 2, filepaths)
+        self.assertEqual(["http://pouac.com/hyph_en_US.dic"], urls)
+
+    def test_install_many_overlapping_locales(self):
+        filepaths, urls = self.install_many(["fr_FR", "en_US", "fr_BE"])
+
+        fr_filepath = os.path.join(self.directory, "hyph_fr_FR.dic")
+        self.assertEqual(
+            [fr_filepath, os.path.join(self.directory, "hyph_en_US.dic"), fr_filepath], filepaths)
+        self.assertEqual(1, urls.count("http://pouac.com/hyph_fr.dic"))
+        self.assertEqual(fr_filepath, hyphen.dictools.install("fr_BE", directory=self.directory))
+        self.assertEqual(
+            ["dictionaries.json", "hyph_en_US.dic", "hyph_fr_FR.dic"],
+            sorted(os.listdir(self.directory)))
+
+    def test_install_many_failed_download(self):
+        def urlopen(url):
+            if url.endswith("hyph_de.dic"):
+                return FailingReader(b"partial")
+            return io.BytesIO(b"content")
+
+        with mock.patch.object(hyphen.dictools, "_find_dictionary_url",
+                               lambda language, repos, use_description: (
+                                   "http://pouac.com/hyph_" + language + ".dic", [language])):
+            with mock.patch.object(hyphen.dictools.urllib.request, "urlopen", urlopen):
+                with self.assertRaises(ConnectionResetError):
+                    hyphen.dictools.install_many(["en_US", "de"], directory=self.directory)
+
+        self.assertEqual([], hyphen.dictools.list_installed(self.directory))
+        self.assertEqual([], os.listdir(self.directory))
+
+    def test_install_many_already_installed(self):
+        dictionaries = hyphen.dictools.Dictionaries(self.directory)
+        en_filepath = dictionaries.add("en", b"content", ["en_US"], "http://pouac.com")
+
+        filepaths, urls = self.install_many(["en_US", "de"])
+
+        self.assertEqual([en_filepath, os.path.join(self.directory, "hyph_de.dic")], filepaths)
+        self.assertEqual(["http://pouac.com/hyph_de.dic"], urls)
+
+    def test_install_many_overwrite(self):
+        dictionaries = hyphen.dictools.Dictionaries(self.directory)
+        dictionaries.add("en", b"content", ["en_US"], "http://pouac.com")
+
+        filepaths, urls = self.install_many(["en_US"], overwrite=True)
+
+        self.assertEqual([os.path.join(self.directory, "hyph_en_US.dic")], filepaths)
+        self.assertEqual(["http://pouac.com/hyph_en_US.dic"], urls)
+        with open(filepaths[0], "rb") as f:
+            self.assertEqual(b"http://pouac.com/hyph_en_US.dic", f.read())
+
+    def test_save_without_orjson(self):
+        with mock.patch.object(hyphen.dictools, 'orjson', None):
+            dictionaries = hyphen.dictools.Dictionaries(self.directory)
+            dictionaries.add("fr_FR", b"content", ['fr_BE', 'fr_FR'], "http://pouac.com")
+            dictionaries = hyphen.dictools.Dictionaries(self.directory)
+
+        self.assertEqual(['fr_BE', 'fr_FR'], dictionaries.installed_languages())
+
+    def test_save_sorted_keys(self):
+        for index, json_module in enumerate([hyphen.dictools.orjson, None]):
+            directory = os.path.join(self.directory, str(index))
+            with mock.patch.object(hyphen.dictools, 'orjson', json_module):
+                with mock.patch.object(hyphen.dictools, 'SORT_CONFIG_KEYS', True):
+                    dictionaries = hyphen.dictools.Dictionaries(directory)
+                    dictionaries.add("fr_FR", b"content", ['fr_FR', 'fr_BE'], "http://pouac.com")
+
+            with open(dictionaries.path) as f:
+                content = f.read()
+            self.assertLess(content.index('"fr_BE"'), content.index('"fr_FR"'))
+            self.assertLess(content.index('"file"'), content.index('"url"'))
+
+    def test_filepath_after_overwrite(self):
+        dictionaries = hyphen.dictools.Dictionaries(self.directory)
+        dictionaries.add("fr", b"content", ['fr_FR'], "http://pouac.com")
+        self.assertEqual(os.path.join(self.directory, "hyph_fr.dic"), dictionaries.filepath('fr_FR'))
+
+        dictionaries.add("fr_FR", b"content", ['fr_FR'], "http://pouac.com")
+        self.assertEqual(os.path.join(self.directory, "hyph_fr_FR.dic"), dictionaries.filepath('fr_FR'))
+
+    def test_shared_instance_is_kept_after_own_save(self):
+        dictionaries = hyphen.dictools._get_dictionaries(self.directory)
+        dictionaries.add("fr_FR", b"content", ['fr_FR'], "http://pouac.com")
+
+        self.assertIs(dictionaries, hyphen.dictools._get_dictionaries(self.directory))
+
+    def test_save_only_discards_shared_instance_of_same_directory(self):
+        other_directory = os.path.join(self.directory, "other")
+        dictionaries = hyphen.dictools._get_dictionaries(self.directory)
+        other_dictionaries = hyphen.dictools._get_dictionaries(other_directory)
+
+        hyphen.dictools.Dictionaries(self.directory).save()
+
+        self.assertIsNot(dictionaries, hyphen.dictools._get_dictionaries(self.directory))
+        self.assertIs(other_dictionaries, hyphen.dictools._get_dictionaries(other_directory))
+
+    def test_concurrent_add(self):
+        dictionaries = hyphen.dictools._get_dictionaries(self.directory)
+        languages = ["l%d" % i for i in range(20)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(
+                lambda language: dictionaries.add(
+                    language, b"content", [language, language + "_XX"], "http://pouac.com"),
+                languages))
+
+        expected = sorted(languages + [language + "_XX" for language in languages])
+        self.assertEqual(expected, hyphen.dictools.list_installed(self.directory))
+        with open(dictionaries.path) as f:
+            config = json.load(f)
+        self.assertEqual(expected, sorted(config))
+        for language in languages:
+            self.assertEqual("hyph_" + language + ".dic", config[language]["file"])
+            self.assertEqual("hyph_" + language + ".dic", config[language + "_XX"]["file"])
+
+        # Uninstalling removes exactly the locales that share the same file
+        for language in languages[:10]:
+            hyphen.dictools.uninstall(language + "_XX", directory=self.directory)
+        remaining = sorted(languages[10:] + [language + "_XX" for language in languages[10:]])
+        self.assertEqual(remaining, hyphen.dictools.list_installed(self.directory))
+
+    def download_xcu(self, available):
+        """
+        Return a mock of _download_dictionaries_xcu that serves the fixtures
+        for the 'available' origin urls, and the list of downloaded urls.
+        """
+        downloaded = []
+
+        def download(origin_url):
+            downloaded.append(origin_url)
+            fixture = available.get(origin_url)
+            if fixture is None:
+                return None
+            if isinstance(fixture, bytes):
+                return FailingReader(fixture)
+            return open(os.path.join(os.path.dirname(__file__), "fixtures", fixture, "dictionaries.xcu"), "rb")
+        return download, downloaded
+
+    def test_find_dictionary_location_falls_back_to_country_code(self):
+        download, _downloaded = self.download_xcu({"http://pouac.com/fr": "fr_FR"})
+        with mock.patch.object(hyphen.dictools, "_download_dictionaries_xcu", download):
+            url, locales = hyphen.dictools.find_dictionary_location("http://pouac.com/", "fr_FR")
+
+        self.assertEqual("http://pouac.com/fr/hyph_fr.dic", url)
+        self.assertIn("fr_BE", locales)
+
+    def test_find_dictionary_location_prefers_full_language(self):
+        download, _downloaded = self.download_xcu({
+            "http://pouac.com/fr_FR": "fr_FR",
+            "http://pouac.com/fr": "fr_FR",
+        })
+        with mock.patch.object(hyphen.dictools, "_download_dictionaries_xcu", download):
+            url, _locales = hyphen.dictools.find_dictionary_location("http://pouac.com/", "fr_FR")
+
+        self.assertEqual("http://pouac.com/fr_FR/hyph_fr.dic", url)
+
+    def test_find_dictionary_location_read_error(self):
+        download, _downloaded = self.download_xcu({
+            "http://pouac.com/fr_FR": b"<?xml version='1.0'?><node>",
+            "http://pouac.com/fr": "fr_FR",
+        })
+        with mock.patch.object(hyphen.dictools, "_download_dictionaries_xcu", download):
+            with self.assertRaises(ConnectionResetError):
+                hyphen.dictools.find_dictionary_location("http://pouac.com/", "fr_FR")
+
+    def test_find_dictionary_location_single_url(self):
+        repository = FakeRepository({"http://pouac.com/en/dictionaries.xcu": "en"})
+        with mock.patch.object(hyphen.dictools.urllib.request, "urlopen", repository):
+            with self.assertRaises(IOError):
+                hyphen.dictools.find_dictionary_location("http://pouac.com/", "en")
+
+        self.assertEqual(["http://pouac.com/en/dictionaries.xcu"], repository.requested)
+
+    def test_find_dictionary_location_is_memoized(self):
+        download, downloaded = self.download_xcu({"http://pouac.com/en": "en"})
+        with mock.patch.object(hyphen.dictools, "_download_dictionaries_xcu", download):
+            url_us, _locales = hyphen.dictools.find_dictionary_location("http://pouac.com/", "en_US")
+            url_gb, _locales = hyphen.dictools.find_dictionary_location("http://pouac.com/", "en_GB")
+
+        self.assertEqual("http://pouac.com/en/hyph_en_US.dic", url_us)
+        self.assertEqual("http://pouac.com/en/hyph_en_GB.dic", url_gb)
+        self.assertEqual(1, downloaded.count("http://pouac.com/en"))
+
+    def test_missing_xcu_is_memoized(self):
+        repository = FakeRepository({"http://pouac.com/en/dictionaries.xcu": "en"})
+        with mock.patch.object(hyphen.dictools.urllib.request, "urlopen", repository):
+            for _ in range(3):
+                url, _locales = hyphen.dictools.find_dictionary_location("http://pouac.com/", "en_US")
+
+        self.assertEqual("http://pouac.com/en/hyph_en_US.dic", url)
+        self.assertEqual(1, repository.requested.count("http://pouac.com/en_US/dictionaries.xcu"))
+        self.assertEqual(1, repository.requested.count("http://pouac.com/en/dictionaries.xcu"))
+
+    def test_unavailable_xcu_is_not_memoized(self):
+        repository = FakeRepository({
+            "http://pouac.com/en_US/dictionaries.xcu": urllib.error.URLError("timeout"),
+            "http://pouac.com/en/dictionaries.xcu": "en",
+        })
+        with mock.patch.object(hyphen.dictools.urllib.request, "urlopen", repository):
+            for _ in range(2):
+                url, _locales = hyphen.dictools.find_dictionary_location("http://pouac.com/", "en_US")
+
+        self.assertEqual("http://pouac.com/en/hyph_en_US.dic", url)
+        self.assertEqual(2, repository.requested.count("http://pouac.com/en_US/dictionaries.xcu"))
+        self.assertEqual(1, repository.requested.count("http://pouac.com/en/dictionaries.xcu"))
+
+    def test_clear_repository_cache(self):
+        download, downloaded = self.download_xcu({"http://pouac.com/en": "en"})
+        with mock.patch.object(hyphen.dictools, "_download_dictionaries_xcu", download):
+            hyphen.dictools.find_dictionary_location("http://pouac.com/", "en_US")
+            hyphen.dictools.clear_repository_cache()
+            hyphen.dictools.find_dictionary_location("http://pouac.com/", "en_US")
+
+        self.assertEqual(2, downloaded.count("http://pouac.com/en"))
+
+    def download_xcu_from(self, server):
+        with mock.patch.object(hyphen.dictools.urllib.request, "urlopen", server):
+            descr_file = hyphen.dictools._download_dictionaries_xcu("http://pouac.com/en")
+        if descr_file is None:
+            return None
+        with descr_file:
+            return descr_file.read()
+
+    def test_download_xcu_with_etag(self):
+        server = FakeServer(FakeResponse(b"<xcu/>", {"ETag": '"abc"'}), not_modified)
+
+        self.assertEqual(b"<xcu/>", self.download_xcu_from(server))
+        self.assertEqual(b"<xcu/>", self.download_xcu_from(server))
+
+        self.assertIsNone(server.requests[0].get_header("If-none-match"))
+        self.assertEqual('"abc"', server.requests[1].get_header("If-none-match"))
+        self.assertIsNone(server.requests[1].get_header("If-modified-since"))
+
+    def test_download_xcu_with_last_modified(self):
+        last_modified = "Thu, 15 Oct 2026 03:51:39 GMT"
+        server = FakeServer(FakeResponse(b"<xcu/>", {"Last-Modified": last_modified}), not_modified)
+
+        self.assertEqual(b"<xcu/>", self.download_xcu_from(server))
+        self.assertEqual(b"<xcu/>", self.download_xcu_from(server))
+
+        self.assertEqual(last_modified, server.requests[1].get_header("If-modified-since"))
+        self.assertIsNone(server.requests[1].get_header("If-none-match"))
+
+    def test_download_modified_xcu(self):
+        server = FakeServer(
+            FakeResponse(b"<xcu/>", {"ETag": '"abc"'}),
+            FakeResponse(b"<xcu2/>", {"ETag": '"def"'}),
+            not_modified,
+        )
+
+        self.assertEqual(b"<xcu/>", self.download_xcu_from(server))
+        self.assertEqual(b"<xcu2/>", self.download_xcu_from(server))
+        self.assertEqual(b"<xcu2/>", self.download_xcu_from(server))
+        self.assertEqual('"def"', server.requests[2].get_header("If-none-match"))
+
+    def test_download_xcu_without_validators(self):
+        server = FakeServer(FakeResponse(b"<xcu/>"), FakeResponse(b"<xcu/>"))
+
+        self.assertEqual(b"<xcu/>", self.download_xcu_from(server))
+        self.assertEqual(b"<xcu/>", self.download_xcu_from(server))
+
+        self.assertEqual([], os.listdir(self.cache_directory))
+        self.assertEqual({}, dict(server.requests[1].header_items()))
+
+    def test_download_xcu_not_found(self):
+        server = FakeServer(urllib.error.HTTPError("http://pouac.com/en/dictionaries.xcu", 404, "Not Found", {}, None))
+
+        self.assertIsNone(self.download_xcu_from(server))
+
+    def test_download_xcu_removed_from_cache(self):
+        def remove_cache_and_not_modified():
+            shutil.rmtree(os.path.join(self.cache_directory, "xcu"))
+            return not_modified()
+
+        server = FakeServer(
+            FakeResponse(b"<xcu/>", {"ETag": '"abc"'}),
+            remove_cache_and_not_modified,
+            FakeResponse(b"<xcu/>", {"ETag": '"abc"'}),
+        )
+
+        self.assertEqual(b"<xcu/>", self.download_xcu_from(server))
+        self.assertEqual(b"<xcu/>", self.download_xcu_from(server))
+
+        self.assertEqual('"abc"', server.requests[1].get_header("If-none-match"))
+        self.assertIsNone(server.requests[2].get_header("If-none-match"))
+
+    def test_download_xcu_with_unwritable_cache(self):
+        server = FakeServer(FakeResponse(b"<xcu/>", {"ETag": '"abc"'}))
+
+        with mock.patch.object(hyphen.dictools, "DEFAULT_CACHE_PATH", "/dev/null/cache"):
+            self.assertEqual(b"<xcu/>", self.download_xcu_from(server))
+
+    def test_find_dictionary_location_completes_all_downloads(self):
+        repository = FakeRepository({
+            "http://pouac.com/fr_FR/dictionaries.xcu": "fr_FR",
+            "http://pouac.com/fr/dictionaries.xcu": "fr_FR",
+        })
+        with mock.patch.object(hyphen.dictools.urllib.request, "urlopen", repository):
+            url, _locales = hyphen.dictools.find_dictionary_location("http://pouac.com/", "fr_FR")
+            requested = list(repository.requested)
+            hyphen.dictools.find_dictionary_location("http://pouac.com/", "fr_FR")
+
+        self.assertEqual("http://pouac.com/fr_FR/hyph_fr.dic", url)
+        self.assertEqual(
+            ["http://pouac.com/fr/dictionaries.xcu", "http://pouac.com/fr_FR/dictionaries.xcu"],
+            sorted(requested))
+        # Both results were memoized
+        self.assertEqual(requested, repository.requested)